@@ -10,6 +10,13 @@ The package uses nbformat for reliable notebook manipulation.
 
 __version__ = "0.1.0"
 
-from .core import NBUtils
+__all__ = ["NBUtils"]
 
-__all__ = ["NBUtils"]
\ No newline at end of file
+
+def __getattr__(name: str):
+    # Import NBUtils on first access so that importing the package (e.g. for
+    # the CLI entry point) doesn't load the conversion modules eagerly
+    if name == "NBUtils":
+        from .core import NBUtils
+        return NBUtils
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
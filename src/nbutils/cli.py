@@ -1,34 +1,217 @@
 """Command-line interface for NBUtils."""
 
+import os
+import re
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from typing import Any
 
 import click
 
-from .core import NBUtils
-from .operations.headings import adjust_file_headings
+
+# Separators flattened into underscores in batch output file names
+_PATH_SEPARATORS = re.compile(r'[\\/]')
+
+# Fewer files than this are processed without starting a process pool
+_MIN_PARALLEL_ITEMS = 4
+
+# Largest pool ProcessPoolExecutor accepts on Windows
+_MAX_WINDOWS_WORKERS = 61
+
+
+def _find_by_ext(path: str, extension: str) -> Iterator[str]:
+    """Recursively yield paths of files with the given extension.
+    
+    Walks the tree with os.scandir so file type checks come from the
+    directory entry itself instead of an extra stat call per file.
+    """
+    root = os.path.normpath(path)
+    # Keep paths under the current directory relative, as Path.rglob did
+    stack = ['' if root == os.curdir else root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                for entry in entries:
+                    entry_path = entry.path if directory else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry_path)
+                    elif entry.name.endswith(extension):
+                        yield entry_path
+        except OSError:
+            continue
 
 
 def find_notebooks(path: str = '.') -> list[str]:
     """Find all Jupyter notebooks in the given path."""
-    return [str(p) for p in Path(path).rglob('*.ipynb')]
+    return list(_find_by_ext(path, '.ipynb'))
 
 
 def find_python_files(path: str = '.') -> list[str]:
     """Find all Python files in the given path."""
-    return [str(p) for p in Path(path).rglob('*.py')]
+    return list(_find_by_ext(path, '.py'))
 
 
-def get_output_path(input_path: str, output_dir: str, extension: str) -> str:
+def get_output_path(input_path: str, out_dir: Path, cwd: Path, extension: str) -> str:
     """Convert input path to output path in the specified output directory.
     
+    The output directory and working directory are passed in so a batch
+    resolves them once instead of once per file.
+    
     Example: 'path/to/notebook.ipynb' -> 'output_dir/path_to_notebook.md'
     """
+    path = Path(input_path)
     # Convert path to relative if it's absolute
-    rel_path = Path(input_path).relative_to(Path.cwd()) if Path(input_path).is_absolute() else Path(input_path)
+    rel_path = path.relative_to(cwd) if path.is_absolute() else path
     # Remove extension and replace path separators with underscores
-    base_name = str(rel_path.with_suffix('')).replace('/', '_').replace('\\', '_')
+    base_name = _PATH_SEPARATORS.sub('_', os.path.splitext(str(rel_path))[0])
     # Create output path
-    return str(Path(output_dir) / f"{base_name}{extension}")
+    return str(out_dir / f"{base_name}{extension}")
+
+
+# NBUtils method producing each combination of batch output extensions;
+# the method takes one output path per extension, in the same order
+_BATCH_CONVERTERS = {
+    ('.md',): 'convert_to_markdown',
+    ('.py',): 'convert_to_py',
+    ('.ipynb',): 'convert_from_py',
+    ('.md', '.py'): 'convert_all',
+}
+
+
+def _convert_one(
+    input_path: str,
+    out_dir: Path,
+    cwd: Path,
+    extensions: tuple[str, ...],
+    options: dict[str, Any]
+) -> tuple[str, list[str], str | None]:
+    """Convert a single file for a batch command.
+    
+    Options are passed as keyword arguments to the conversion method.
+    
+    Returns:
+        Tuple of (input_path, output_paths, error), where error is None on success
+    """
+    from .core import NBUtils
+    
+    output_paths = []
+    try:
+        output_paths = [get_output_path(input_path, out_dir, cwd, ext) for ext in extensions]
+        nb = NBUtils(input_path)
+        getattr(nb, _BATCH_CONVERTERS[extensions])(*output_paths, **options)
+        return input_path, output_paths, None
+    except Exception as e:
+        return input_path, output_paths, str(e)
+
+
+def _available_cpus() -> int:
+    """Return how many CPUs this process may run worker processes on.
+    
+    Honours CPU affinity and container limits where the platform exposes
+    them, and the pool size limit of ProcessPoolExecutor on Windows.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    if sys.platform == 'win32':
+        cpus = min(cpus, _MAX_WINDOWS_WORKERS)
+    return max(1, cpus)
+
+
+def _map_in_workers(
+    func: Callable[..., Any],
+    items: Sequence[str],
+    *args: Any,
+    parallel: bool = True
+) -> Iterator[Any]:
+    """Call func(item, *args) for every item, yielding results in input order.
+    
+    Calls are spread over a process pool with at most one worker per item,
+    so func and the arguments must be picklable; func has to be a
+    module-level function.
+    A few items, or parallel=False, run in this process instead, since
+    starting workers would cost more than it saves.
+    """
+    if not parallel or len(items) < _MIN_PARALLEL_ITEMS:
+        for item in items:
+            yield func(item, *args)
+        return
+    
+    # Hand each worker a few large chunks to keep pickling round-trips low
+    workers = min(_available_cpus(), len(items))
+    chunksize = max(1, len(items) // (workers * 4))
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, items, *map(repeat, args), chunksize=chunksize)
+
+
+def _run_batch(
+    input_paths: list[str],
+    output_dir: str,
+    extensions: tuple[str, ...],
+    **options: Any
+) -> None:
+    """Convert files in parallel and report each result in input order."""
+    # Create output directory if it doesn't exist
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cwd = Path.cwd()
+    
+    results = _map_in_workers(_convert_one, input_paths, out_dir, cwd, extensions, options)
+    for input_path, output_paths, error in results:
+        if error is None:
+            click.echo(f"✓ Converted {input_path} → {', '.join(output_paths)}")
+        else:
+            click.echo(f"✗ Failed to convert {input_path}: {error}")
+
+
+def _adjust_one(
+    file_path: str,
+    increase: bool,
+    force: bool
+) -> tuple[Any, str | None]:
+    """Adjust headings in a single file for inc-heads or dec-heads.
+    
+    Returns:
+        Tuple of (result, error), where result is the HeadingAdjustmentResult,
+        or None if adjusting raised, and error is the exception message
+    """
+    from .operations.headings import adjust_file_headings
+    
+    try:
+        return adjust_file_headings(file_path, increase, force), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _file_identity(file_path: str) -> tuple[int, int] | str:
+    """Return a key that is equal for all paths naming the same file."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return os.path.realpath(file_path)
+    return st.st_dev, st.st_ino
+
+
+def _adjust_all(
+    files: tuple[str, ...],
+    increase: bool,
+    force: bool = False
+) -> Iterator[tuple[str, Any, str | None]]:
+    """Adjust headings in files in parallel, yielding results in input order.
+    
+    A list naming the same file twice, under any spelling or through links,
+    is handled in this process so the adjustments apply one after another.
+    """
+    parallel = len(set(map(_file_identity, files))) == len(files)
+    results = _map_in_workers(_adjust_one, files, increase, force, parallel=parallel)
+    for file_path, (result, error) in zip(files, results):
+        yield file_path, result, error
 
 
 @click.group()
@@ -40,8 +223,11 @@ def cli():
 @cli.command('convert')
 @click.argument('input_path')
 @click.argument('output_path')
-def convert(input_path: str, output_path: str):
+@click.option('--pretty', is_flag=True, help='Indent notebook JSON output instead of writing it compactly')
+def convert(input_path: str, output_path: str, pretty: bool):
     """Convert between notebook, markdown, and python formats."""
+    from .core import NBUtils
+    
     try:
         if input_path.endswith('.ipynb'):
             # Convert notebook to markdown or python
@@ -67,7 +253,7 @@ def convert(input_path: str, output_path: str):
             # Convert Python to notebook
             if output_path.endswith('.ipynb'):
                 nb = NBUtils(input_path)
-                nb.convert_from_py(output_path)
+                nb.convert_from_py(output_path, pretty=pretty)
                 click.echo(f"✓ Converted {input_path} → {output_path}")
             else:
                 click.echo("✗ Unsupported output format for Python input. Use .ipynb.")
@@ -80,22 +266,16 @@ def convert(input_path: str, output_path: str):
 @cli.command('batch-md')
 @click.argument('path', default='.')
 @click.option('-o', '--output-dir', default='markdown', help='Output directory for markdown files')
-def batch_to_markdown(path: str, output_dir: str):
+@click.option('--also-py', is_flag=True, help='Also write Python files, parsing each notebook once')
+def batch_to_markdown(path: str, output_dir: str, also_py: bool):
     """Convert all notebooks in path to markdown."""
     notebooks = find_notebooks(path)
-    click.echo(f"Found {len(notebooks)} notebook(s). Converting to markdown...")
-    
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    for nb_path in notebooks:
-        try:
-            md_path = get_output_path(nb_path, output_dir, '.md')
-            nb = NBUtils(nb_path)
-            nb.convert_to_markdown(md_path)
-            click.echo(f"✓ Converted {nb_path} → {md_path}")
-        except Exception as e:
-            click.echo(f"✗ Failed to convert {nb_path}: {str(e)}")
+    if also_py:
+        click.echo(f"Found {len(notebooks)} notebook(s). Converting to markdown and Python...")
+        _run_batch(notebooks, output_dir, ('.md', '.py'))
+    else:
+        click.echo(f"Found {len(notebooks)} notebook(s). Converting to markdown...")
+        _run_batch(notebooks, output_dir, ('.md',))
 
 
 @cli.command('batch-py')
@@ -105,39 +285,18 @@ def batch_to_python(path: str, output_dir: str):
     """Convert all notebooks in path to Python files."""
     notebooks = find_notebooks(path)
     click.echo(f"Found {len(notebooks)} notebook(s). Converting to Python...")
-    
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    for nb_path in notebooks:
-        try:
-            py_path = get_output_path(nb_path, output_dir, '.py')
-            nb = NBUtils(nb_path)
-            nb.convert_to_py(py_path)
-            click.echo(f"✓ Converted {nb_path} → {py_path}")
-        except Exception as e:
-            click.echo(f"✗ Failed to convert {nb_path}: {str(e)}")
+    _run_batch(notebooks, output_dir, ('.py',))
 
 
 @cli.command('batch-ipynb')
 @click.argument('path', default='.')
 @click.option('-o', '--output-dir', default='notebooks', help='Output directory for Jupyter notebooks')
-def batch_to_notebook(path: str, output_dir: str):
+@click.option('--pretty', is_flag=True, help='Indent the notebook JSON instead of writing it compactly')
+def batch_to_notebook(path: str, output_dir: str, pretty: bool):
     """Convert all Python files in path to Jupyter notebooks."""
     py_files = find_python_files(path)
     click.echo(f"Found {len(py_files)} Python file(s). Converting to Jupyter notebooks...")
-    
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    for py_path in py_files:
-        try:
-            ipynb_path = get_output_path(py_path, output_dir, '.ipynb')
-            nb = NBUtils(py_path)
-            nb.convert_from_py(ipynb_path)
-            click.echo(f"✓ Converted {py_path} → {ipynb_path}")
-        except Exception as e:
-            click.echo(f"✗ Failed to convert {py_path}: {str(e)}")
+    _run_batch(py_files, output_dir, ('.ipynb',), pretty=pretty)
 
 
 @cli.command('inc-heads')
@@ -154,15 +313,13 @@ def increase_headings(files: tuple[str, ...]):
         click.echo("✗ No files specified.")
         return
     
-    for file_path in files:
-        try:
-            result = adjust_file_headings(file_path, increase=True)
-            if result.success:
-                click.echo(f"✓ Increased headings in {file_path}")
-            else:
-                click.echo(f"✗ Failed to update {file_path}: {result.error}")
-        except Exception as e:
-            click.echo(f"✗ Failed to update {file_path}: {str(e)}")
+    for file_path, result, error in _adjust_all(files, increase=True):
+        if result is None:
+            click.echo(f"✗ Failed to update {file_path}: {error}")
+        elif result.success:
+            click.echo(f"✓ Increased headings in {file_path}")
+        else:
+            click.echo(f"✗ Failed to update {file_path}: {result.error}")
 
 
 @cli.command('dec-heads')
@@ -186,14 +343,12 @@ def decrease_headings(files: tuple[str, ...], force: bool):
     
     # First pass: check all files for first-level headings
     files_with_warnings = []
-    for file_path in files:
-        try:
-            result = adjust_file_headings(file_path, increase=False, force=False)
-            if not result.success and result.warnings:
-                files_with_warnings.append((file_path, result.warnings))
-        except Exception as e:
-            click.echo(f"✗ Failed to check {file_path}: {str(e)}")
+    for file_path, result, error in _adjust_all(files, increase=False, force=False):
+        if result is None:
+            click.echo(f"✗ Failed to check {file_path}: {error}")
             return
+        if not result.success and result.warnings:
+            files_with_warnings.append((file_path, result.warnings))
     
     # If we have warnings and not forcing, ask for confirmation
     if files_with_warnings and not force:
@@ -212,18 +367,16 @@ def decrease_headings(files: tuple[str, ...], force: bool):
         force = True
     
     # Process all files
-    for file_path in files:
-        try:
-            result = adjust_file_headings(file_path, increase=False, force=force)
-            if result.success:
-                click.echo(f"✓ Decreased headings in {file_path}")
-                if result.warnings:
-                    for warning in result.warnings:
-                        click.echo(f"  ⚠ {warning}")
-            else:
-                click.echo(f"✗ Failed to update {file_path}: {result.error}")
-        except Exception as e:
-            click.echo(f"✗ Failed to update {file_path}: {str(e)}")
+    for file_path, result, error in _adjust_all(files, increase=False, force=force):
+        if result is None:
+            click.echo(f"✗ Failed to update {file_path}: {error}")
+        elif result.success:
+            click.echo(f"✓ Decreased headings in {file_path}")
+            if result.warnings:
+                for warning in result.warnings:
+                    click.echo(f"  ⚠ {warning}")
+        else:
+            click.echo(f"✗ Failed to update {file_path}: {result.error}")
 
 
 if __name__ == '__main__':
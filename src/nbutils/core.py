@@ -1,10 +1,52 @@
 """Core NBUtils class for notebook operations."""
 
-import json
-from pathlib import Path
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
 
+from .fileio import dumps, loads, read_bytes, write_bytes
 from .operations.convert import notebook_to_markdown, notebook_to_py, py_to_notebook
-from .operations.headings import adjust_file_headings
+
+
+# Parsed notebooks keyed on (st_dev, st_ino, st_mtime_ns, st_size), most
+# recently used last
+_NOTEBOOK_CACHE: OrderedDict[tuple[int, int, int, int], dict[str, Any]] = OrderedDict()
+_NOTEBOOK_CACHE_SIZE = 64
+_NOTEBOOK_CACHE_LOCK = threading.Lock()
+
+
+def _load_notebook(path: str | os.PathLike) -> dict[str, Any]:
+    """Parse a notebook file, keeping only what the converters read.
+    
+    Cached on the identity of the file that was opened (device and inode)
+    plus its modification time and size, so repeated conversions of an
+    unchanged notebook reuse the parsed content, whatever path or working
+    directory it is reached from. Outputs and metadata are dropped right
+    after parsing so cached entries don't keep large embedded images alive.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        st = os.fstat(f.fileno())
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        with _NOTEBOOK_CACHE_LOCK:
+            cached = _NOTEBOOK_CACHE.get(key)
+            if cached is not None:
+                _NOTEBOOK_CACHE.move_to_end(key)
+                return cached
+        notebook = loads(f.read())
+    
+    content = {
+        'cells': [
+            {'cell_type': cell['cell_type'], 'source': cell['source']}
+            for cell in notebook['cells']
+        ]
+    }
+    with _NOTEBOOK_CACHE_LOCK:
+        _NOTEBOOK_CACHE[key] = content
+        if len(_NOTEBOOK_CACHE) > _NOTEBOOK_CACHE_SIZE:
+            _NOTEBOOK_CACHE.popitem(last=False)
+    return content
 
 
 class NBUtils:
@@ -12,31 +54,56 @@ class NBUtils:
     
     def __init__(self, input_path: str | None = None):
         self.input_path = input_path
+    
+    def _read_notebook(self) -> dict[str, Any]:
+        """Read the input notebook, reusing a cached parse when unchanged."""
+        return _load_notebook(self.input_path)
         
     def convert_to_markdown(self, output_path: str | None = None) -> str:
         """Convert notebook to markdown"""
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            notebook_content = json.load(f)
+        notebook_content = self._read_notebook()
             
         markdown_content = notebook_to_markdown(notebook_content)
         
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            write_bytes(output_path, markdown_content.encode('utf-8'))
         return markdown_content
 
     def convert_to_py(self, output_path: str | None = None) -> str:
         """Convert notebook to Python file"""
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            notebook_content = json.load(f)
+        notebook_content = self._read_notebook()
             
         py_content = notebook_to_py(notebook_content)
         
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(py_content)
+            write_bytes(output_path, py_content.encode('utf-8'))
         return py_content
 
+    def convert_all(
+        self,
+        markdown_path: str | None = None,
+        py_path: str | None = None
+    ) -> tuple[str, str]:
+        """Convert notebook to both markdown and Python, parsing it only once.
+        
+        Args:
+            markdown_path: Optional path to write the markdown output to
+            py_path: Optional path to write the Python output to
+            
+        Returns:
+            Tuple of (markdown_content, py_content)
+        """
+        notebook_content = self._read_notebook()
+        
+        markdown_content = notebook_to_markdown(notebook_content)
+        py_content = notebook_to_py(notebook_content)
+        
+        if markdown_path:
+            write_bytes(markdown_path, markdown_content.encode('utf-8'))
+        if py_path:
+            write_bytes(py_path, py_content.encode('utf-8'))
+        return markdown_content, py_content
+
     def adjust_headings(self, increase: bool, force: bool = False) -> None:
         """Adjust heading levels in the notebook.
         
@@ -44,18 +111,24 @@ class NBUtils:
             increase: True to increase heading levels, False to decrease
             force: If True, proceed even with first-level headings when decreasing
         """
+        from .operations.headings import adjust_file_headings
+        
         result = adjust_file_headings(self.input_path, increase, force)
         if not result.success:
             raise ValueError(result.error or "Failed to adjust headings")
         
-    def convert_from_py(self, output_path: str | None = None) -> dict[str, any]:
-        """Convert Python file to Jupyter notebook"""
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            py_content = f.read()
+    def convert_from_py(self, output_path: str | None = None, pretty: bool = False) -> dict[str, any]:
+        """Convert Python file to Jupyter notebook
+        
+        The notebook is written as compact JSON unless pretty is True, in
+        which case it is indented with two spaces.
+        """
+        # py_to_notebook normalizes line endings itself, so skip the text
+        # layer's newline translation and decode the whole file at once
+        py_content = read_bytes(self.input_path).decode('utf-8')
             
         notebook_content = py_to_notebook(py_content)
         
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(notebook_content, f, indent=2)
+            write_bytes(output_path, dumps(notebook_content, indent=pretty))
         return notebook_content
\ No newline at end of file
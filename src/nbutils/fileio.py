@@ -0,0 +1,160 @@
+"""Helpers for reading and writing notebook files.
+
+Uses orjson when it is installed (``pip install nbutils[fast]``) and falls
+back to the standard library json module otherwise.
+"""
+
+import json
+import os
+import secrets
+import stat
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def read_bytes(path: str | os.PathLike) -> bytes:
+    """Read a whole file into a single bytes object.
+    
+    Unbuffered, so there is no intermediate buffer: FileIO.readall sizes
+    its result from fstat up front and keeps reading until end of file, so
+    short reads on network or FUSE filesystems can't truncate the data.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        return f.read()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or text.
+    
+    orjson rejects some documents that the stdlib json module used by
+    nbformat and Jupyter writes, such as NaN values or lone surrogate
+    escapes, so those are parsed again with the stdlib.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON.
+    
+    Args:
+        obj: The object to serialize
+        indent: If True, indent nested structures with two spaces, otherwise
+            write compact JSON without any whitespace
+        
+    Returns:
+        The encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def dumps_notebook(notebook: dict[str, Any]) -> bytes:
+    """Serialize a notebook in the layout written by nbformat and Jupyter.
+    
+    Sorted keys and one-space indentation mean that rewriting a notebook
+    saved by Jupyter only changes the cells that were edited. orjson has
+    no one-space indent, so this always uses the stdlib encoder.
+    """
+    text = json.dumps(notebook, sort_keys=True, indent=1, ensure_ascii=False)
+    return (text + '\n').encode('utf-8')
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve space for size bytes in a new file before it is written.
+    
+    Lets the filesystem allocate the file in one go instead of extending it
+    as the data arrives. Purely an optimization, so platforms and
+    filesystems without posix_fallocate are silently skipped.
+    """
+    if size and hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            pass
+
+
+def write_bytes(path: str | os.PathLike, data: bytes) -> None:
+    """Atomically replace a file with encoded content.
+    
+    The content is written in a single call to a temporary file in the same
+    directory, which is then renamed over the target. Readers never see a
+    partially written file, so no fsync is needed between files in a batch.
+    The temporary file is preallocated to its final size where supported.
+    
+    Symlinks are written through: the file they point to is replaced, not
+    the link. Existing permission bits and, where allowed, ownership are
+    kept. A file with several hard links is rewritten in place instead, as
+    a rename would detach it from its other names.
+    """
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    
+    if st is not None and st.st_nlink > 1:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return
+    
+    fd, tmp = _create_temp(path)
+    try:
+        with open(fd, 'wb') as f:
+            if st is not None:
+                _copy_owner(fd, st)
+            _preallocate(fd, len(data))
+            f.write(data)
+        if st is not None:
+            os.chmod(tmp, stat.S_IMODE(st.st_mode))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _create_temp(path: str) -> tuple[int, str]:
+    """Create a new, uniquely named temporary file next to path.
+    
+    The file is created with mode 0o666, so the kernel applies the process
+    umask just as it would for a file opened with open(path, 'w').
+    
+    Returns:
+        Tuple of (fd, temp_path) for the file, opened for writing
+    """
+    directory, name = os.path.split(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def _copy_owner(fd: int, st: os.stat_result) -> None:
+    """Give an open file the owner and group from st, as far as permitted."""
+    if not hasattr(os, 'fchown'):
+        return
+    own = os.fstat(fd)
+    if (own.st_uid, own.st_gid) == (st.st_uid, st.st_gid):
+        return
+    try:
+        os.fchown(fd, st.st_uid, st.st_gid)
+    except PermissionError:
+        # Unprivileged users may still hand the file to one of their groups
+        try:
+            os.fchown(fd, -1, st.st_gid)
+        except PermissionError:
+            pass
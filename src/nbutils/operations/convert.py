@@ -1,49 +1,118 @@
 """Operations for converting between Jupyter notebooks, Python files, and markdown."""
 
+import re
+
+
+# Code fences wrapping code cells in markdown output
+_FENCE_OPEN = '```python\n'
+_FENCE_CLOSE = '\n```\n\n'
+
+# A commented-out line that was blank or whitespace-only
+_BLANK_COMMENT = re.compile(r'\n# [^\S\n]*(?=\n|\Z)')
+
+# Runs of comment or blank lines (group 1) and runs of code lines (group 2)
+_BLOCK_RE = re.compile(r'((?:[^\S\n]*(?:#.*)?\n)+)|((?:[^\S\n]*[^\s#].*\n)+)')
+# Line boundaries recognised by str.splitlines, other than '\n'
+_OTHER_LINE_BREAKS = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+# Comment marker removed from comment lines at the start of a line
+_COMMENT_PREFIX = re.compile(r'^# ?', re.MULTILINE)
+
+
+def _markdown_to_comments(source: str) -> str:
+    """Comment out every line of a markdown source.
+    
+    Lines starting with '#' get one more '#', other non-blank lines are
+    prefixed with '# ' and whitespace-only lines are emptied.
+    """
+    # Prefix every line with '# ', then merge the space away on lines that
+    # already started with '#'. A leading newline makes the first line match.
+    commented = ('\n' + source).replace('\n', '\n# ').replace('\n# #', '\n##')
+    return _BLANK_COMMENT.sub('\n', commented)[1:]
+
+
+def _join_blocks(parts: list[str]) -> str:
+    """Join output pieces, dropping the newline that ends the last block.
+    
+    Every block ends with a newline separator in its last (constant) piece,
+    so the trailing one is dropped there rather than by slicing a copy of
+    the joined output.
+    """
+    if parts:
+        parts[-1] = parts[-1][:-1]
+    return ''.join(parts)
+
 
 def notebook_to_markdown(notebook_content: dict[str, any]) -> str:
     """Convert Jupyter notebook to markdown format"""
-    markdown_lines = []
+    parts = []
+    append = parts.append
+    extend = parts.extend
     
+    # List sources are spliced into the output pieces as they are, so the
+    # lines are only joined once, together with the rest of the output
     for cell in notebook_content['cells']:
-        source = cell['source']
-        if isinstance(source, list):
-            source = ''.join(source)
-            
-        if cell['cell_type'] == 'markdown':
-            markdown_lines.append(source)
-            markdown_lines.append('')
-        elif cell['cell_type'] == 'code':
-            markdown_lines.append('```python')
-            markdown_lines.append(source)
-            markdown_lines.append('```')
-            markdown_lines.append('')
-            
-    return '\n'.join(markdown_lines)
+        cell_type = cell['cell_type']
+        if cell_type == 'markdown':
+            source = cell['source']
+            if type(source) is list:
+                extend(source)
+            else:
+                append(source)
+            append('\n\n')
+        elif cell_type == 'code':
+            source = cell['source']
+            append(_FENCE_OPEN)
+            if type(source) is list:
+                extend(source)
+            else:
+                append(source)
+            append(_FENCE_CLOSE)
+    
+    return _join_blocks(parts)
 
 def notebook_to_py(notebook_content: dict[str, any]) -> str:
     """Convert Jupyter notebook to Python file with markdown as comments"""
-    py_lines = []
+    parts = []
+    append = parts.append
+    extend = parts.extend
     
+    # Code sources are spliced into the output pieces as they are; markdown
+    # sources are commented out as a whole, so only those are joined
     for cell in notebook_content['cells']:
-        source = cell['source']
-        if isinstance(source, list):
-            source = ''.join(source)
-            
-        if cell['cell_type'] == 'markdown':
-            for line in source.split('\n'):
-                if line.strip():
-                    if line.startswith('#'):
-                        py_lines.append(f"#{line}")
-                    else:
-                        py_lines.append(f"# {line}")
-                else:
-                    py_lines.append('')
-        elif cell['cell_type'] == 'code':
-            py_lines.append(source)
-            py_lines.append('')
-            
-    return '\n'.join(py_lines)
+        cell_type = cell['cell_type']
+        if cell_type == 'markdown':
+            source = cell['source']
+            if type(source) is list:
+                source = ''.join(source)
+            append(_markdown_to_comments(source))
+            append('\n')
+        elif cell_type == 'code':
+            source = cell['source']
+            if type(source) is list:
+                extend(source)
+            else:
+                append(source)
+            append('\n\n')
+    
+    return _join_blocks(parts)
+
+def _code_block_to_cell(block: str) -> dict[str, any]:
+    """Build a code cell from newline-terminated Python lines."""
+    return {
+        "cell_type": "code",
+        "execution_count": None,
+        "metadata": {},
+        "outputs": [],
+        "source": block.splitlines(keepends=True)
+    }
+
+def _comment_block_to_cell(block: str) -> dict[str, any]:
+    """Build a markdown cell from newline-terminated comment lines."""
+    return {
+        "cell_type": "markdown",
+        "metadata": {},
+        "source": _COMMENT_PREFIX.sub('', block).splitlines(keepends=True)
+    }
 
 def py_to_notebook(py_content: str) -> dict[str, any]:
     """Convert Python file to Jupyter notebook format
@@ -78,58 +147,20 @@ def py_to_notebook(py_content: str) -> dict[str, any]:
         "nbformat_minor": 4
     }
     
-    lines = py_content.splitlines()
-    current_block = []
-    current_type = None
-    
-    # Helper function to add the current block as a cell
-    def add_current_block():
-        nonlocal current_block, current_type
-        if not current_block:
-            return
-            
-        if current_type == "code":
-            notebook["cells"].append({
-                "cell_type": "code",
-                "execution_count": None,
-                "metadata": {},
-                "outputs": [],
-                "source": [line + "\n" for line in current_block]
-            })
-        elif current_type == "markdown":
-            # Convert Python comments to markdown
-            markdown_lines = []
-            for line in current_block:
-                if line.startswith("# "):
-                    markdown_lines.append(line[2:])
-                elif line.startswith("#"):
-                    markdown_lines.append(line[1:])
-                else:
-                    markdown_lines.append(line)
-                    
-            notebook["cells"].append({
-                "cell_type": "markdown",
-                "metadata": {},
-                "source": [line + "\n" for line in markdown_lines]
-            })
-            
-        current_block = []
-        current_type = None
-    
-    # Process each line
-    for line in lines:
-        # Detect if this is a comment or code line
-        is_comment = line.strip().startswith("#") or not line.strip()
-        line_type = "markdown" if is_comment else "code"
-        
-        # If we're switching between comment and code, add the current block as a cell
-        if current_type and current_type != line_type:
-            add_current_block()
-            
-        current_type = line_type
-        current_block.append(line)
+    # Every line, including the last, must end in '\n'. Rebuilding the text
+    # from splitlines is only needed when other line boundaries are present.
+    if _OTHER_LINE_BREAKS.search(py_content):
+        lines = py_content.splitlines()
+        text = '\n'.join(lines) + '\n' if lines else ''
+    elif py_content and not py_content.endswith('\n'):
+        text = py_content + '\n'
+    else:
+        text = py_content
     
-    # Add the final block
-    add_current_block()
+    # Each match is a run of comment/blank lines (group 1) or code lines (group 2)
+    notebook["cells"] = [
+        _comment_block_to_cell(match[1]) if match[1] else _code_block_to_cell(match[2])
+        for match in _BLOCK_RE.finditer(text)
+    ]
     
     return notebook 
\ No newline at end of file
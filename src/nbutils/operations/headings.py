@@ -1,13 +1,23 @@
 """Operations for adjusting heading levels in Jupyter notebooks and markdown files."""
 
+import mmap
+import os
+import re
+from contextlib import nullcontext
 from pathlib import Path
 from dataclasses import dataclass
 
-import nbformat
-from nbformat.notebooknode import NotebookNode
+from ..fileio import dumps_notebook, loads, read_bytes, write_bytes
 
 
-@dataclass
+# A line starting with '#' in UTF-8 encoded markdown, after its line break
+_NEWLINE_HASH = re.compile(rb'\n#')
+
+# Markdown files at least this large are memory-mapped instead of read
+_MMAP_MIN_SIZE = 1 << 20
+
+
+@dataclass(slots=True, frozen=True)
 class HeadingAdjustmentResult:
     """Result of a heading adjustment operation."""
     success: bool
@@ -15,31 +25,6 @@ class HeadingAdjustmentResult:
     error: str | None = None
 
 
-def _adjust_heading_line(line: str, increase: bool) -> str:
-    """Adjust a single heading line.
-    
-    Args:
-        line: The line to adjust
-        increase: True to increase heading level (add #), False to decrease
-        
-    Returns:
-        The adjusted line
-    """
-    if not line.startswith('#'):
-        return line
-    
-    if increase:
-        return '#' + line
-    else:
-        # Decrease: remove one #
-        if line.startswith('## '):
-            return line[1:]
-        elif line.startswith('#'):
-            # For single # or #without space, just remove one
-            return line[1:]
-        return line
-
-
 def _has_first_level_heading(source: str | list[str]) -> bool:
     """Check if markdown source contains first-level headings.
     
@@ -50,11 +35,12 @@ def _has_first_level_heading(source: str | list[str]) -> bool:
         True if source contains '# ' at the start of any line
     """
     if isinstance(source, str):
-        lines = source.split('\n')
-    else:
-        lines = source
+        return source.startswith('# ') or '\n# ' in source
     
-    return any(line.startswith('# ') for line in lines)
+    # Substring search over the joined lines rules out most cells at C speed
+    if '# ' not in ''.join(source):
+        return False
+    return any(line.startswith('# ') for line in source)
 
 
 def _adjust_markdown_source(source: str | list[str], increase: bool) -> str | list[str]:
@@ -67,12 +53,56 @@ def _adjust_markdown_source(source: str | list[str], increase: bool) -> str | li
     Returns:
         Adjusted source in the same format as input
     """
-    is_list = isinstance(source, list)
-    lines = source if is_list else source.split('\n')
+    if isinstance(source, list):
+        # Most markdown cells have no '#' at all; a substring search over the
+        # joined lines is much cheaper than testing each line in Python
+        if '#' not in ''.join(source):
+            return source
+        # One line per item: add or drop a '#' on items that start with one
+        if increase:
+            return ['#' + line if line[:1] == '#' else line for line in source]
+        return [line[1:] if line[:1] == '#' else line for line in source]
     
-    adjusted_lines = [_adjust_heading_line(line, increase) for line in lines]
+    # Most markdown cells have no headings, so return them untouched
+    starts_with_heading = source.startswith('#')
+    if not starts_with_heading and '\n#' not in source:
+        return source
     
-    return adjusted_lines if is_list else '\n'.join(adjusted_lines)
+    # Add or drop one '#' after every newline, then fix up the first line
+    if increase:
+        adjusted = source.replace('\n#', '\n##')
+        return '#' + adjusted if starts_with_heading else adjusted
+    adjusted = source.replace('\n#', '\n')
+    return adjusted[1:] if starts_with_heading else adjusted
+
+
+def _map_file(f) -> mmap.mmap | nullcontext[bytes]:
+    """Map an open binary file read-only, or just read it if it is small.
+    
+    Mapping has a fixed setup cost that only pays off for larger files, and
+    empty files can't be mapped at all.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size == 0 or size < _MMAP_MIN_SIZE:
+        return nullcontext(f.read())
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _adjust_markdown_bytes(content: bytes | mmap.mmap, increase: bool) -> bytes | None:
+    """Adjust heading levels in UTF-8 encoded markdown.
+    
+    Works like _adjust_markdown_source on a string, but on any bytes-like
+    object, including a memory-mapped file. Returns None if the content has
+    no lines starting with '#', as there is nothing to adjust.
+    """
+    starts_with_heading = content[:1] == b'#'
+    if not starts_with_heading and content.find(b'\n#') == -1:
+        return None
+    if increase:
+        adjusted = _NEWLINE_HASH.sub(b'\n##', content)
+        return b'#' + adjusted if starts_with_heading else adjusted
+    adjusted = _NEWLINE_HASH.sub(b'\n', content)
+    return adjusted[1:] if starts_with_heading else adjusted
 
 
 def adjust_notebook_headings(
@@ -90,19 +120,35 @@ def adjust_notebook_headings(
     Returns:
         HeadingAdjustmentResult with status and any warnings
     """
-    notebook_path = Path(notebook_path)
+    if not isinstance(notebook_path, Path):
+        notebook_path = Path(notebook_path)
     
-    if not notebook_path.exists():
+    try:
+        data = read_bytes(notebook_path)
+    except (FileNotFoundError, NotADirectoryError):
         return HeadingAdjustmentResult(
             success=False,
             warnings=[],
             error=f"File {notebook_path} does not exist"
         )
+    except Exception as e:
+        return HeadingAdjustmentResult(
+            success=False,
+            warnings=[],
+            error=f"Failed to read notebook: {str(e)}"
+        )
     
     try:
-        # Read notebook using nbformat
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            notebook = nbformat.read(f, as_version=4)
+        notebook = loads(data)
+        # Headings only touch markdown sources, so v4 notebooks are edited as
+        # plain JSON. Older formats are upgraded by nbformat, which pulls in
+        # jsonschema and is only imported for them; setting NBUTILS_STRICT=1
+        # sends every notebook through nbformat and validates it.
+        strict = os.environ.get('NBUTILS_STRICT') == '1'
+        use_nbformat = strict or notebook.get('nbformat') != 4
+        if use_nbformat:
+            import nbformat
+            notebook = nbformat.reads(data.decode('utf-8'), as_version=4)
     except Exception as e:
         return HeadingAdjustmentResult(
             success=False,
@@ -110,35 +156,62 @@ def adjust_notebook_headings(
             error=f"Failed to read notebook: {str(e)}"
         )
     
+    # nbformat.reads only logs schema violations, so check explicitly
+    if strict:
+        try:
+            nbformat.validate(notebook)
+        except nbformat.ValidationError as e:
+            return HeadingAdjustmentResult(
+                success=False,
+                warnings=[],
+                error=f"Invalid notebook: {e.message}"
+            )
+    
     warnings = []
+    check_first_level = not increase and not force
+    
+    # Check for first-level headings and compute adjustments in one pass over
+    # the cells; nothing is modified until every cell has been checked
+    adjusted = []
+    for cell in notebook['cells']:
+        if cell['cell_type'] != 'markdown':
+            continue
+        source = cell['source']
+        # If decreasing would remove a first-level heading and we're not
+        # forcing, return without modifying
+        if check_first_level and _has_first_level_heading(source):
+            warnings.append(
+                "Found first-level heading(s). Decreasing will result in non-heading text."
+            )
+            return HeadingAdjustmentResult(
+                success=False,
+                warnings=warnings,
+                error=None
+            )
+        new_source = _adjust_markdown_source(source, increase)
+        if new_source != source:
+            adjusted.append((cell, new_source))
     
-    # Check for first-level headings if decreasing
-    if not increase and not force:
-        for cell in notebook.cells:
-            if cell.cell_type == 'markdown':
-                if _has_first_level_heading(cell.source):
-                    warnings.append(
-                        "Found first-level heading(s). Decreasing will result in non-heading text."
-                    )
-                    break
-    
-    # If we found warnings and not forcing, return without modifying
-    if warnings and not force:
+    # Leave the file untouched if no markdown cell has a heading
+    if not adjusted:
         return HeadingAdjustmentResult(
-            success=False,
+            success=True,
             warnings=warnings,
             error=None
         )
     
     # Adjust headings in all markdown cells
-    for cell in notebook.cells:
-        if cell.cell_type == 'markdown':
-            cell.source = _adjust_markdown_source(cell.source, increase)
+    for cell, source in adjusted:
+        cell['source'] = source
     
-    # Write back using nbformat
+    # Write back in nbformat's on-disk layout
     try:
-        with open(notebook_path, 'w', encoding='utf-8') as f:
-            nbformat.write(notebook, f)
+        if use_nbformat:
+            text = nbformat.writes(notebook)
+            data = (text if text.endswith('\n') else text + '\n').encode('utf-8')
+        else:
+            data = dumps_notebook(notebook)
+        write_bytes(notebook_path, data)
     except Exception as e:
         return HeadingAdjustmentResult(
             success=False,
@@ -168,18 +241,34 @@ def adjust_markdown_headings(
     Returns:
         HeadingAdjustmentResult with status and any warnings
     """
-    markdown_path = Path(markdown_path)
+    if not isinstance(markdown_path, Path):
+        markdown_path = Path(markdown_path)
     
-    if not markdown_path.exists():
+    try:
+        f = open(markdown_path, 'rb')
+    except (FileNotFoundError, NotADirectoryError):
         return HeadingAdjustmentResult(
             success=False,
             warnings=[],
             error=f"File {markdown_path} does not exist"
         )
+    except Exception as e:
+        return HeadingAdjustmentResult(
+            success=False,
+            warnings=[],
+            error=f"Failed to read markdown file: {str(e)}"
+        )
     
     try:
-        with open(markdown_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Work on the raw bytes: '#' and '\n' are single bytes in UTF-8,
+        # so headings can be adjusted without decoding the file
+        with f, _map_file(f) as content:
+            # Only a decrease without force needs the first-level check, and
+            # a warning means the adjusted copy would be thrown away
+            first_level = not increase and not force and (
+                content[:2] == b'# ' or content.find(b'\n# ') != -1
+            )
+            adjusted_content = None if first_level else _adjust_markdown_bytes(content, increase)
     except Exception as e:
         return HeadingAdjustmentResult(
             success=False,
@@ -189,28 +278,28 @@ def adjust_markdown_headings(
     
     warnings = []
     
-    # Check for first-level headings if decreasing
-    if not increase and not force:
-        if _has_first_level_heading(content):
-            warnings.append(
-                "Found first-level heading(s). Decreasing will result in non-heading text."
-            )
-    
-    # If we found warnings and not forcing, return without modifying
-    if warnings and not force:
+    # Leave the file as it is until the caller confirms with force
+    if first_level:
+        warnings.append(
+            "Found first-level heading(s). Decreasing will result in non-heading text."
+        )
         return HeadingAdjustmentResult(
             success=False,
             warnings=warnings,
             error=None
         )
     
-    # Adjust headings
-    adjusted_content = _adjust_markdown_source(content, increase)
+    # Leave the file untouched if it has no headings
+    if adjusted_content is None:
+        return HeadingAdjustmentResult(
+            success=True,
+            warnings=warnings,
+            error=None
+        )
     
     # Write back
     try:
-        with open(markdown_path, 'w', encoding='utf-8') as f:
-            f.write(adjusted_content)
+        write_bytes(markdown_path, adjusted_content)
     except Exception as e:
         return HeadingAdjustmentResult(
             success=False,
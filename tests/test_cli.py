@@ -0,0 +1,69 @@
+"""Tests for the helpers behind the nbu command-line interface."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from nbutils import cli
+
+
+def _double(item, factor):
+    return item * factor
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """Thread pool standing in for the process pool, recording its size."""
+    
+    max_workers = []
+    
+    def __init__(self, max_workers):
+        type(self).max_workers.append(max_workers)
+        super().__init__(max_workers=max_workers)
+
+
+def test_map_in_workers_runs_few_items_in_process(monkeypatch):
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', None)
+    
+    results = cli._map_in_workers(_double, ['a', 'b'], 2)
+    
+    assert list(results) == ['aa', 'bb']
+
+
+def test_map_in_workers_caps_workers_at_item_count(monkeypatch):
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', _RecordingExecutor)
+    monkeypatch.setattr(cli, '_available_cpus', lambda: 64)
+    _RecordingExecutor.max_workers = []
+    items = [str(i) for i in range(cli._MIN_PARALLEL_ITEMS)]
+    
+    results = cli._map_in_workers(_double, items, 3)
+    
+    assert list(results) == [item * 3 for item in items]
+    assert _RecordingExecutor.max_workers == [len(items)]
+
+
+def test_available_cpus_follows_affinity(monkeypatch):
+    monkeypatch.setattr(cli.os, 'sched_getaffinity', lambda pid: {0, 1}, raising=False)
+    monkeypatch.setattr(cli.os, 'cpu_count', lambda: 64)
+    
+    assert cli._available_cpus() == 2
+
+
+def test_available_cpus_respects_windows_pool_limit(monkeypatch):
+    monkeypatch.delattr(cli.os, 'sched_getaffinity', raising=False)
+    monkeypatch.setattr(cli.os, 'cpu_count', lambda: 128)
+    monkeypatch.setattr(cli.sys, 'platform', 'win32')
+    
+    assert cli._available_cpus() == 61
+
+
+def test_adjust_all_runs_aliases_of_one_file_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', None)
+    target = tmp_path / 'notes.md'
+    target.write_bytes(b'# Title\n')
+    (tmp_path / 'other.md').write_bytes(b'text\n')
+    (tmp_path / 'more.md').write_bytes(b'text\n')
+    monkeypatch.chdir(tmp_path)
+    files = ('notes.md', './notes.md', 'other.md', 'more.md')
+    
+    results = list(cli._adjust_all(files, increase=True))
+    
+    assert [result.success for _, result, _ in results] == [True] * 4
+    assert target.read_bytes() == b'### Title\n'
@@ -0,0 +1,94 @@
+"""Tests pinning the output of the converters in nbutils.operations.convert."""
+
+import pytest
+
+from nbutils.operations.convert import notebook_to_markdown, notebook_to_py, py_to_notebook
+
+
+def _markdown(source):
+    return {'cell_type': 'markdown', 'metadata': {}, 'source': source}
+
+
+def _code(source):
+    return {'cell_type': 'code', 'metadata': {}, 'source': source}
+
+
+HEADINGS = {'cells': [
+    _markdown(['# Title\n', '\n', 'Some *text*\n', '## Sub']),
+    _code(['x = 1\n', 'print(x)']),
+]}
+WHITESPACE = {'cells': [
+    _markdown('Intro\n   \n\t\nEnd'),
+    _markdown('# #hash\n#!shebang\n text # not'),
+]}
+EMPTY_CELLS = {'cells': [
+    _markdown(''),
+    {'cell_type': 'raw', 'metadata': {}, 'source': 'raw'},
+    _code(''),
+]}
+
+
+@pytest.mark.parametrize('notebook, expected', [
+    (HEADINGS, '## Title\n\n# Some *text*\n### Sub\nx = 1\nprint(x)\n'),
+    # Whitespace-only lines are emptied; lines starting with '#' get one more
+    (WHITESPACE, '# Intro\n\n\n# End\n## #hash\n##!shebang\n#  text # not'),
+    (EMPTY_CELLS, '\n\n'),
+    ({'cells': []}, ''),
+])
+def test_notebook_to_py(notebook, expected):
+    assert notebook_to_py(notebook) == expected
+
+
+@pytest.mark.parametrize('notebook, expected', [
+    (HEADINGS, '# Title\n\nSome *text*\n## Sub\n\n```python\nx = 1\nprint(x)\n```\n'),
+    (WHITESPACE, 'Intro\n   \n\t\nEnd\n\n# #hash\n#!shebang\n text # not\n'),
+    (EMPTY_CELLS, '\n\n```python\n\n```\n'),
+    ({'cells': []}, ''),
+])
+def test_notebook_to_markdown(notebook, expected):
+    assert notebook_to_markdown(notebook) == expected
+
+
+def _cells(py_content):
+    return [
+        (cell['cell_type'], cell['source'])
+        for cell in py_to_notebook(py_content)['cells']
+    ]
+
+
+@pytest.mark.parametrize('py_content, expected', [
+    (
+        '# Title\n#\n# text\n\nimport os\n\n\nx = 1\n# trailing comment\ny = 2',
+        [
+            ('markdown', ['Title\n', '\n', 'text\n', '\n']),
+            ('code', ['import os\n']),
+            ('markdown', ['\n', '\n']),
+            ('code', ['x = 1\n']),
+            ('markdown', ['trailing comment\n']),
+            ('code', ['y = 2\n']),
+        ]
+    ),
+    # Every line boundary recognised by str.splitlines becomes '\n'
+    ('a = 1\r\nb = 2\r\n# c\r\n', [('code', ['a = 1\n', 'b = 2\n']), ('markdown', ['c\n'])]),
+    ('a = 1\rb = 2\r#c', [('code', ['a = 1\n', 'b = 2\n']), ('markdown', ['c\n'])]),
+    ('x = 1\x0cy = 2\u2028# z\n', [('code', ['x = 1\n', 'y = 2\n']), ('markdown', ['z\n'])]),
+    # Indented comments and whitespace-only lines stay in markdown cells as they are
+    ('   # indented\n  \n\tcode\n', [('markdown', ['   # indented\n', '  \n']), ('code', ['\tcode\n'])]),
+    ('\n\n', [('markdown', ['\n', '\n'])]),
+    ('', []),
+])
+def test_py_to_notebook_cells(py_content, expected):
+    assert _cells(py_content) == expected
+
+
+def test_py_to_notebook_structure():
+    notebook = py_to_notebook('x = 1\n')
+    
+    assert notebook['nbformat'] == 4
+    assert notebook['cells'] == [{
+        'cell_type': 'code',
+        'execution_count': None,
+        'metadata': {},
+        'outputs': [],
+        'source': ['x = 1\n'],
+    }]
@@ -0,0 +1,53 @@
+"""Tests for the NBUtils class in nbutils.core."""
+
+import json
+import os
+
+from nbutils.core import NBUtils
+
+
+def _write_notebook(path, source):
+    notebook = {
+        'cells': [{'cell_type': 'code', 'metadata': {}, 'source': source}],
+        'metadata': {},
+        'nbformat': 4,
+        'nbformat_minor': 5,
+    }
+    path.write_text(json.dumps(notebook))
+    os.utime(path, ns=(0, 0))
+
+
+def test_cached_notebook_follows_the_file_not_the_path(tmp_path, monkeypatch):
+    (tmp_path / 'one').mkdir()
+    (tmp_path / 'two').mkdir()
+    # Same relative name, size and modification time, different content
+    _write_notebook(tmp_path / 'one' / 'nb.ipynb', 'x = 1')
+    _write_notebook(tmp_path / 'two' / 'nb.ipynb', 'y = 2')
+    
+    monkeypatch.chdir(tmp_path / 'one')
+    assert NBUtils('nb.ipynb').convert_to_py() == 'x = 1\n'
+    monkeypatch.chdir(tmp_path / 'two')
+    assert NBUtils('nb.ipynb').convert_to_py() == 'y = 2\n'
+
+
+def test_cached_notebook_is_reused_through_other_paths(tmp_path, monkeypatch):
+    _write_notebook(tmp_path / 'nb.ipynb', 'x = 1')
+    monkeypatch.chdir(tmp_path)
+    
+    first = NBUtils('nb.ipynb')._read_notebook()
+    
+    assert NBUtils(str(tmp_path / 'nb.ipynb'))._read_notebook() is first
+
+
+def test_converts_notebook_with_nan_output(tmp_path):
+    # json.dump and nbformat.write emit NaN, which orjson refuses to parse
+    path = tmp_path / 'nan.ipynb'
+    path.write_text(
+        '{"cells": [{"cell_type": "code", "metadata": {}, "execution_count": 1,'
+        ' "source": "x", "outputs": [{"output_type": "execute_result",'
+        ' "execution_count": 1, "metadata": {},'
+        ' "data": {"application/json": {"value": NaN}}}]}],'
+        ' "metadata": {}, "nbformat": 4, "nbformat_minor": 5}'
+    )
+    
+    assert NBUtils(str(path)).convert_to_markdown() == '```python\nx\n```\n'
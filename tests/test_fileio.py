@@ -0,0 +1,82 @@
+"""Tests for the file helpers in nbutils.fileio."""
+
+import math
+import os
+import stat
+
+import pytest
+
+from nbutils.fileio import loads, read_bytes, write_bytes
+
+
+def test_loads_accepts_what_the_stdlib_json_module_writes():
+    data = loads(b'{"nan": NaN, "inf": -Infinity, "text": "\\ud83d"}')
+    
+    assert math.isnan(data['nan'])
+    assert data['inf'] == -math.inf
+    assert data['text'] == '\ud83d'
+
+
+def test_read_bytes_reads_whole_file(tmp_path):
+    data = bytes(range(256)) * 40000
+    (tmp_path / 'data.bin').write_bytes(data)
+    (tmp_path / 'empty.bin').write_bytes(b'')
+    
+    assert read_bytes(tmp_path / 'data.bin') == data
+    assert read_bytes(tmp_path / 'empty.bin') == b''
+
+
+def test_write_bytes_creates_file(tmp_path):
+    target = tmp_path / 'new.md'
+    
+    write_bytes(target, b'# Title\n')
+    
+    assert target.read_bytes() == b'# Title\n'
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_write_bytes_new_file_honours_current_umask(tmp_path):
+    old_umask = os.umask(0o077)
+    try:
+        write_bytes(tmp_path / 'new.md', b'text\n')
+    finally:
+        os.umask(old_umask)
+    
+    assert stat.S_IMODE((tmp_path / 'new.md').stat().st_mode) == 0o600
+
+
+def test_write_bytes_keeps_permission_bits(tmp_path):
+    target = tmp_path / 'file.md'
+    target.write_bytes(b'old\n')
+    target.chmod(0o640)
+    
+    write_bytes(target, b'new\n')
+    
+    assert target.read_bytes() == b'new\n'
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason='needs symlinks')
+def test_write_bytes_writes_through_symlink(tmp_path):
+    real = tmp_path / 'real.md'
+    real.write_bytes(b'old\n')
+    link = tmp_path / 'link.md'
+    link.symlink_to(real.name)
+    
+    write_bytes(link, b'new\n')
+    
+    assert link.is_symlink()
+    assert real.read_bytes() == b'new\n'
+
+
+@pytest.mark.skipif(not hasattr(os, 'link'), reason='needs hard links')
+def test_write_bytes_keeps_hard_links(tmp_path):
+    first = tmp_path / 'first.md'
+    first.write_bytes(b'old\n')
+    second = tmp_path / 'second.md'
+    os.link(first, second)
+    
+    write_bytes(first, b'new\n')
+    
+    assert os.path.samefile(first, second)
+    assert second.read_bytes() == b'new\n'
@@ -0,0 +1,184 @@
+"""Tests for heading adjustment in nbutils.operations.headings."""
+
+import json
+import os
+
+import nbformat
+import pytest
+
+from nbutils.operations import headings
+from nbutils.operations.headings import adjust_file_headings
+
+
+def _write_notebook(path, *sources):
+    """Save a notebook the way Jupyter does, one markdown cell per source."""
+    notebook = nbformat.v4.new_notebook()
+    for source in sources:
+        notebook.cells.append(nbformat.v4.new_markdown_cell(source))
+    notebook.cells.append(nbformat.v4.new_code_cell('# a comment, not a heading'))
+    nbformat.write(notebook, path)
+    return notebook
+
+
+def _sources(path):
+    notebook = json.loads(path.read_text(encoding='utf-8'))
+    return [
+        ''.join(cell['source']) if isinstance(cell['source'], list) else cell['source']
+        for cell in notebook['cells']
+    ]
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason='needs symlinks')
+def test_adjust_headings_through_symlink(tmp_path):
+    real = tmp_path / 'real.md'
+    real.write_bytes(b'# Title\ntext\n## Section\n')
+    link = tmp_path / 'link.md'
+    link.symlink_to(real.name)
+    
+    result = adjust_file_headings(link, increase=True)
+    
+    assert result.success
+    assert link.is_symlink()
+    assert real.read_bytes() == b'## Title\ntext\n### Section\n'
+
+
+def test_adjust_headings_in_notebook_with_nan_output(tmp_path):
+    # Same NaN output as in test_core; the notebook is parsed again when written back
+    path = tmp_path / 'nan.ipynb'
+    path.write_text(
+        '{"cells": [{"cell_type": "markdown", "metadata": {}, "source": "# Title"},'
+        ' {"cell_type": "code", "metadata": {}, "execution_count": 1, "source": "x",'
+        ' "outputs": [{"output_type": "execute_result", "execution_count": 1,'
+        ' "metadata": {}, "data": {"application/json": {"value": NaN}}}]}],'
+        ' "metadata": {}, "nbformat": 4, "nbformat_minor": 5}'
+    )
+    
+    result = adjust_file_headings(path, increase=True)
+    
+    assert result.success
+    text = path.read_text()
+    assert '"## Title"' in text
+    assert '"value": NaN' in text
+
+
+def test_strict_mode_rejects_invalid_notebook(tmp_path, monkeypatch):
+    monkeypatch.setenv('NBUTILS_STRICT', '1')
+    path = tmp_path / 'invalid.ipynb'
+    path.write_text(
+        '{"cells": [{"cell_type": "markdown", "id": "a1", "metadata": {},'
+        ' "source": "# Title", "bogus": 1}],'
+        ' "metadata": {}, "nbformat": 4, "nbformat_minor": 5}'
+    )
+    before = path.read_bytes()
+    
+    result = adjust_file_headings(path, increase=True)
+    
+    assert not result.success
+    assert "'bogus' was unexpected" in result.error
+    assert path.read_bytes() == before
+
+
+def test_strict_mode_accepts_valid_notebook(tmp_path, monkeypatch):
+    monkeypatch.setenv('NBUTILS_STRICT', '1')
+    path = tmp_path / 'valid.ipynb'
+    path.write_text(
+        '{"cells": [{"cell_type": "markdown", "id": "a1", "metadata": {},'
+        ' "source": "# Title"}],'
+        ' "metadata": {}, "nbformat": 4, "nbformat_minor": 5}'
+    )
+    
+    result = adjust_file_headings(path, increase=True)
+    
+    assert result.success
+    assert '"## Title"' in path.read_text()
+
+
+def test_adjust_notebook_headings_matches_nbformat_output(tmp_path):
+    path = tmp_path / 'saved.ipynb'
+    notebook = _write_notebook(path, '# Título\ntext\n## Sub', 'no heading', '#x\n  # indented')
+    
+    result = adjust_file_headings(path, increase=True)
+    
+    assert result.success
+    notebook.cells[0].source = '## Título\ntext\n### Sub'
+    notebook.cells[2].source = '##x\n  # indented'
+    expected = tmp_path / 'expected.ipynb'
+    nbformat.write(notebook, expected)
+    assert path.read_bytes() == expected.read_bytes()
+
+
+def test_adjust_notebook_headings_list_and_string_sources(tmp_path):
+    path = tmp_path / 'mixed.ipynb'
+    path.write_text(json.dumps({
+        'cells': [
+            {'cell_type': 'markdown', 'metadata': {}, 'source': ['# A\n', 'text\n', '## B']},
+            {'cell_type': 'markdown', 'metadata': {}, 'source': '## C\n#D\ntext # E'},
+            {'cell_type': 'raw', 'metadata': {}, 'source': '# raw'},
+        ],
+        'metadata': {},
+        'nbformat': 4,
+        'nbformat_minor': 5,
+    }))
+    
+    assert adjust_file_headings(path, increase=False, force=True).success
+    assert _sources(path) == [' A\ntext\n# B', '# C\nD\ntext # E', '# raw']
+    
+    assert adjust_file_headings(path, increase=True).success
+    assert _sources(path) == [' A\ntext\n## B', '## C\nD\ntext # E', '# raw']
+
+
+def test_decrease_notebook_with_first_level_heading_warns(tmp_path):
+    path = tmp_path / 'h1.ipynb'
+    _write_notebook(path, '## Fine', '# Top\ntext')
+    before = path.read_bytes()
+    
+    result = adjust_file_headings(path, increase=False)
+    
+    assert not result.success
+    assert result.error is None
+    assert result.warnings == [
+        "Found first-level heading(s). Decreasing will result in non-heading text."
+    ]
+    assert path.read_bytes() == before
+
+
+def test_notebook_without_headings_is_not_rewritten(tmp_path):
+    path = tmp_path / 'plain.ipynb'
+    _write_notebook(path, 'just text', 'more text # not a heading')
+    before = path.read_bytes()
+    os.utime(path, ns=(0, 0))
+    
+    for increase in (True, False):
+        result = adjust_file_headings(path, increase=increase)
+        
+        assert result.success
+        assert path.read_bytes() == before
+        assert path.stat().st_mtime_ns == 0
+
+
+@pytest.mark.parametrize('mmap_min_size', [0, 1 << 20])
+def test_adjust_markdown_headings_mapped_or_read(tmp_path, monkeypatch, mmap_min_size):
+    monkeypatch.setattr(headings, '_MMAP_MIN_SIZE', mmap_min_size)
+    path = tmp_path / 'notes.md'
+    path.write_bytes('# Título\r\ntext #1\r\n## Sub\r\n#tag'.encode('utf-8'))
+    
+    assert adjust_file_headings(path, increase=True).success
+    assert path.read_bytes() == '## Título\r\ntext #1\r\n### Sub\r\n##tag'.encode('utf-8')
+    
+    result = adjust_file_headings(path, increase=False)
+    assert result.success
+    assert path.read_bytes() == '# Título\r\ntext #1\r\n## Sub\r\n#tag'.encode('utf-8')
+    
+    result = adjust_file_headings(path, increase=False)
+    assert not result.success
+    assert result.warnings
+    assert path.read_bytes() == '# Título\r\ntext #1\r\n## Sub\r\n#tag'.encode('utf-8')
+
+
+def test_adjust_empty_markdown_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(headings, '_MMAP_MIN_SIZE', 0)
+    path = tmp_path / 'empty.md'
+    path.write_bytes(b'')
+    
+    assert adjust_file_headings(path, increase=True).success
+    assert path.read_bytes() == b''